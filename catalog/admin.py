@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Case, CharField, Value, When
 from .models import Author, Tag, Book, Copy, Review, Loan
 
 # Register your models here.
@@ -61,6 +62,18 @@ class BookAdmin(admin.ModelAdmin):
     
     # Make these fields read-only (auto-generated)
     readonly_fields = ['created_at', 'updated_at']
+    
+    # The list view doesn't show the large description/metadata columns,
+    # so skip them there (the edit form still loads the full row)
+    def get_changelist(self, request, **kwargs):
+        ChangeList = super().get_changelist(request, **kwargs)
+        
+        class DeferredChangeList(ChangeList):
+            def get_queryset(self, request, exclude_parameters=None):
+                qs = super().get_queryset(request, exclude_parameters)
+                return qs.defer('description', 'metadata')
+        
+        return DeferredChangeList
 
 
 @admin.register(Copy)
@@ -71,7 +84,20 @@ class CopyAdmin(admin.ModelAdmin):
     search_fields = ['barcode', 'book__title']  # Can search by book title!
     list_filter = ['status', 'created_at']
     
+    # Search box instead of a dropdown with every book
+    autocomplete_fields = ['book']
+    
+    # Large table: smaller pages, and skip the extra unfiltered COUNT(*)
+    # (the paginator still counts the filtered rows)
+    list_per_page = 50
+    show_full_result_count = False
+    
     readonly_fields = ['created_at', 'updated_at']
+    
+    # Copy.__str__ uses book.title, so join the book for every queryset
+    # (covers the changelist and the Loan form's copy autocomplete)
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('book')
 
 
 @admin.register(Review)
@@ -82,6 +108,17 @@ class ReviewAdmin(admin.ModelAdmin):
     search_fields = ['book__title', 'user__username', 'comment']
     list_filter = ['rating', 'created_at']
     
+    # Fetch book and user in the same query (avoids one query per row)
+    list_select_related = ('book', 'user')
+    
+    # Search boxes instead of dropdowns with every book/user
+    # (users are searchable through Django's built-in UserAdmin)
+    autocomplete_fields = ['book', 'user']
+    
+    # Same paging settings as CopyAdmin
+    list_per_page = 50
+    show_full_result_count = False
+    
     readonly_fields = ['created_at', 'updated_at']
 
 
@@ -93,9 +130,31 @@ class LoanAdmin(admin.ModelAdmin):
     search_fields = ['user__username', 'copy__barcode', 'copy__book__title']
     list_filter = ['borrowed_at', 'due_back', 'returned_at']
     
+    # Fetch user, copy and the copy's book in the same query
+    # (Copy.__str__ uses book.title, so it must be joined too)
+    list_select_related = ('user', 'copy', 'copy__book')
+    
+    # Search boxes instead of dropdowns with every copy/user
+    autocomplete_fields = ['copy', 'user']
+    
+    # Same paging settings as CopyAdmin
+    list_per_page = 50
+    show_full_result_count = False
+    
     readonly_fields = ['borrowed_at', 'created_at', 'updated_at']
     
+    # Compute the loan status in the database so it comes back with each row
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _loan_status=Case(
+                When(returned_at__isnull=True, then=Value('Active')),
+                default=Value('Returned'),
+                output_field=CharField(),
+            )
+        )
+    
     # Custom method to show if loan is active or returned
     def loan_status(self, obj):
-        return "Active" if obj.returned_at is None else "Returned"
-    loan_status.short_description = 'Status'
\ No newline at end of file
+        return obj._loan_status
+    loan_status.short_description = 'Status'
+    loan_status.admin_order_field = '_loan_status'  # makes the column sortable
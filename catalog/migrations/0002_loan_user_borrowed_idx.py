@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-14 18:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['user', '-borrowed_at'], name='loan_user_borrowed_idx'),
+        ),
+    ]
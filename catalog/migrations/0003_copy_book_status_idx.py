@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-14 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_loan_user_borrowed_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='copy',
+            index=models.Index(fields=['book', 'status'], name='copy_book_status_idx'),
+        ),
+    ]
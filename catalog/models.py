@@ -37,6 +37,12 @@ class Author(models.Model):
         #sort authors when listing them
         ordering = ['last_name', 'first_name']
 
+        #INDEX: matches the ordering, so listing authors needs no sort
+        # (the unique_together index starts with first_name, so it can't be used)
+        indexes = [
+            models.Index(fields=['last_name', 'first_name'], name='author_name_idx'),
+        ]
+
     def __str__(self):
         # this is how the object will appear in django logs
         return f"{self.first_name} {self.last_name}"
@@ -130,6 +136,11 @@ class Book(models.Model):
         #sort books alphabetically when listing them
         ordering = ['title']
 
+        #INDEX: matches the ordering, so listing books needs no sort
+        indexes = [
+            models.Index(fields=['title'], name='book_title_idx'),
+        ]
+
     def __str__(self):
         # this is how the object will appear in django logs
         return self.title
@@ -194,6 +205,11 @@ class Copy(models.Model):
         #sort copies by status when listing them
         ordering = ['status']
 
+        #INDEX: fast lookups for "available copies of this book"
+        indexes = [
+            models.Index(fields=['book', 'status'], name='copy_book_status_idx'),
+        ]
+
     def __str__(self):
         # this is how the object will appear in django logs
         return f"Copy {self.barcode} of {self.book.title}"
@@ -299,6 +315,14 @@ class Loan(models.Model):
                 name='only_one_active_loan_per_copy'
             ),
         ]
+        # The constraint above is a partial unique index on copy WHERE returned_at IS NULL,
+        # so it already serves filter(copy=..., returned_at__isnull=True) - no extra index needed
+
+        #INDEX: fast lookups for "loans of this user"
+        indexes = [
+            # matches the default ordering, so user.loans.all() needs no sort
+            models.Index(fields=['user', '-borrowed_at'], name='loan_user_borrowed_idx'),
+        ]
     def __str__(self):
         status = "Active" if self.returned_at is None else "Returned"
         return f"{self.user.username} - {self.copy.barcode} ({status})"
@@ -307,6 +331,5 @@ class Loan(models.Model):
         Check if load is overdue
         """
         from django.utils import timezone
-        if self.returned_at is None and timezone.now() > self.due_back:
-            return True
-        return False
+        # due_back is a date, so compare against today's date (not a datetime)
+        return self.returned_at is None and timezone.localdate() > self.due_back
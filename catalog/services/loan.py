@@ -10,7 +10,9 @@ Functions:
     - return_copy(copy_id, user_id): Return a borrowed book copy
 """
 
-from django.db import transaction
+from datetime import datetime
+
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from catalog.models import Copy, Loan
@@ -95,19 +97,20 @@ def borrow_copy(copy_id, user_id, due_at):
     """
     Borrow a book copy.
     This function handles all the logic for borrowing a book:
-    1. Validates the copy exists and is available
-    2. Checks there's no active loan already
-    3. Creates a new Loan record
-    4. Updates the Copy status to 'borrowed'
+    1. Updates the Copy status to 'borrowed' if it is available
+    2. Validates the copy exists and is available (only when step 1 fails)
+    3. Creates a new Loan record (the database rejects a second active loan)
     
     All operations happen within a database transaction to ensure atomicity.
-    Uses SELECT FOR UPDATE to prevent race conditions (two users borrowing
-    the same copy at the exact same time).
+    The status change is a conditional UPDATE, which locks the row and
+    prevents race conditions (two users borrowing the same copy at the
+    exact same time) without a separate SELECT FOR UPDATE.
     
     Args:
         copy_id (int): The ID of the book copy to borrow
         user_id (int): The ID of the user borrowing the book
-        due_at (datetime): When the book is due back
+        due_at (date or datetime): When the book is due back
+            (a datetime is stored as its local date)
         
     Returns:
         Loan: The newly created Loan object
@@ -129,51 +132,63 @@ def borrow_copy(copy_id, user_id, due_at):
     # Start a database transaction - everything inside must succeed or all will rollback
     with transaction.atomic():
         
-        # Step 1: Try to get the copy with a lock (SELECT FOR UPDATE)
-        # This prevents other transactions from modifying this copy until we're done
-        try:
-            copy = Copy.objects.select_for_update().get(id=copy_id)
-        except Copy.DoesNotExist:
-            raise CopyNotFoundError(f"Copy with id {copy_id} does not exist.")
+        # One timestamp for the whole borrow, so all the fields agree
+        now = timezone.now()
         
-        # Step 2: Check if the copy is available for borrowing
-        if copy.status != 'available':
-            raise CopyNotAvailableError(
-                f"Copy {copy_id} is not available. Current status: {copy.status}"
-            )
+        # due_back/due_date are DateFields - store (and return) a plain date
+        if isinstance(due_at, datetime):
+            due_at = timezone.localdate(due_at) if timezone.is_aware(due_at) else due_at.date()
         
-        # Step 3: Check if there's already an active loan for this copy
-        # Active loan = returned_at is NULL (hasn't been returned yet)
-        active_loan = Loan.objects.filter(
-            copy=copy,
-            returned_at__isnull=True
-        ).first()
+        # Step 1: Mark the copy as borrowed, but only if it's still available
+        # The UPDATE locks the row itself, so two users borrowing the same copy
+        # at the same time can't both succeed - the second one updates 0 rows.
+        # update() skips auto_now, so updated_at is set by hand.
+        updated = Copy.objects.filter(id=copy_id, status='available').update(
+            status='borrowed',
+            checkout_date=now,
+            due_date=due_at,
+            updated_at=now,
+        )
         
-        if active_loan:
-            raise AlreadyLoanedError(
-                f"Copy {copy_id} is already loaned to user {active_loan.user.id}"
+        # Step 2: Nothing updated - work out whether the copy is missing or unavailable
+        if updated == 0:
+            status = Copy.objects.filter(id=copy_id).values_list('status', flat=True).first()
+            if status is None:
+                raise CopyNotFoundError(f"Copy with id {copy_id} does not exist.")
+            raise CopyNotAvailableError(
+                f"Copy {copy_id} is not available. Current status: {status}"
             )
         
-        # Step 4: Get the user object
-        try:
-            user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
+        # Step 3: Make sure the user exists
+        # Only an existence check - we don't need to load the whole User row
+        if not User.objects.filter(id=user_id).exists():
             raise LoanServiceError(f"User with id {user_id} does not exist.")
         
-        # Step 5: Create the new loan record
-        loan = Loan.objects.create(
-            copy=copy,
-            user=user,
-            borrowed_at=timezone.now(),  # Current timestamp
-            due_back=due_at
-            # returned_at is NULL by default (not returned yet)
-        )
-        
-        # Step 6: Update the copy's status and tracking fields
-        copy.status = 'borrowed'
-        copy.checkout_date = timezone.now()
-        copy.due_date = due_at
-        copy.save()
+        # Step 4: Create the new loan record
+        # No separate "active loan?" SELECT: the only_one_active_loan_per_copy
+        # constraint rejects a second active loan atomically in the database.
+        # The savepoint keeps the transaction usable if the INSERT fails.
+        try:
+            with transaction.atomic():
+                loan = Loan.objects.create(
+                    copy_id=copy_id,
+                    user_id=user_id,
+                    due_back=due_at
+                    # borrowed_at is filled in automatically (auto_now_add)
+                    # returned_at is NULL by default (not returned yet)
+                )
+        except IntegrityError as e:
+            # Only an existing active loan means the constraint above fired;
+            # any other integrity error is passed on unchanged
+            borrower_id = Loan.objects.filter(
+                copy_id=copy_id,
+                returned_at__isnull=True
+            ).values_list('user_id', flat=True).first()
+            if borrower_id is None:
+                raise
+            raise AlreadyLoanedError(
+                f"Copy {copy_id} is already loaned to user {borrower_id}"
+            ) from e
         
         # Return the created loan
         # The transaction will commit here automatically if no errors occurred
@@ -212,41 +227,45 @@ def return_copy(copy_id, user_id):
     # Start a database transaction
     with transaction.atomic():
         
-        # Step 1: Try to get the copy
-        try:
-            copy = Copy.objects.select_for_update().get(id=copy_id)
-        except Copy.DoesNotExist:
-            raise CopyNotFoundError(f"Copy with id {copy_id} does not exist.")
+        now = timezone.now()
         
-        # Step 2: Find the active loan for this copy
+        # Step 1: Find (and lock) the active loan for this copy
         # Active loan = returned_at is NULL
+        # The copy row itself isn't read - the UPDATE in step 4 locks it.
         try:
             active_loan = Loan.objects.select_for_update().get(
-                copy=copy,
+                copy_id=copy_id,
                 returned_at__isnull=True
             )
         except Loan.DoesNotExist:
+            # Work out whether the copy is missing or just not on loan
+            if not Copy.objects.filter(id=copy_id).exists():
+                raise CopyNotFoundError(f"Copy with id {copy_id} does not exist.")
             raise NoActiveLoanError(
                 f"No active loan found for copy {copy_id}. "
                 "It may have already been returned or never borrowed."
             )
         
-        # Step 3: Verify the user returning the book is the one who borrowed it
-        if active_loan.user.id != user_id:
+        # Step 2: Verify the user returning the book is the one who borrowed it
+        # user_id is already on the loan row - no need to load the User
+        if active_loan.user_id != user_id:
             raise UnauthorizedReturnError(
                 f"User {user_id} cannot return copy {copy_id}. "
-                f"It was borrowed by user {active_loan.user.id}."
+                f"It was borrowed by user {active_loan.user_id}."
             )
         
-        # Step 4: Mark the loan as returned
-        active_loan.returned_at = timezone.now()
-        active_loan.save()
+        # Step 3: Mark the loan as returned
+        active_loan.returned_at = now
+        # only write the changed columns (updated_at is still set by auto_now)
+        active_loan.save(update_fields=['returned_at', 'updated_at'])
         
-        # Step 5: Update the copy's status back to available
-        copy.status = 'available'
-        copy.checkout_date = None
-        copy.due_date = None
-        copy.save()
+        # Step 4: Update the copy's status back to available
+        Copy.objects.filter(pk=copy_id).update(
+            status='available',
+            checkout_date=None,
+            due_date=None,
+            updated_at=now,
+        )
         
         # Return the updated loan
         # The transaction will commit here automatically if no errors occurred
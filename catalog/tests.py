@@ -1,3 +1,239 @@
-from django.test import TestCase
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from catalog.models import Book, Copy, Loan
+from catalog.services.loan import (
+    AlreadyLoanedError,
+    CopyNotAvailableError,
+    CopyNotFoundError,
+    LoanServiceError,
+    NoActiveLoanError,
+    UnauthorizedReturnError,
+    borrow_copy,
+    return_copy,
+)
 
 # Create your tests here.
+
+class LoanTestCase(TestCase):
+    """Shared fixture: two users and one available copy of one book."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader')
+        self.other_user = User.objects.create_user(username='other')
+        self.book = Book.objects.create(title='1984', isbn='9780451524935')
+        self.copy = Copy.objects.create(book=self.book, barcode='BC-001')
+        self.due = timezone.localdate() + timedelta(days=14)
+
+
+# ============================================================
+# LOAN SERVICE: borrow_copy / return_copy
+# ============================================================
+
+class LoanServiceTests(LoanTestCase):
+    """Every success and error path of the loan service."""
+
+    # ---------- borrow_copy ----------
+
+    def test_borrow_marks_copy_borrowed(self):
+        before = self.copy.updated_at
+        loan = borrow_copy(self.copy.id, self.user.id, self.due)
+
+        self.assertEqual(loan.copy_id, self.copy.id)
+        self.assertEqual(loan.user_id, self.user.id)
+        self.assertIsNone(loan.returned_at)
+
+        # the bare update() must write every tracking column, including updated_at
+        self.copy.refresh_from_db()
+        self.assertEqual(self.copy.status, 'borrowed')
+        self.assertEqual(self.copy.checkout_date, timezone.localdate())
+        self.assertEqual(self.copy.due_date, self.due)
+        self.assertGreater(self.copy.updated_at, before)
+
+    def test_borrow_missing_copy(self):
+        with self.assertRaises(CopyNotFoundError):
+            borrow_copy(999999, self.user.id, self.due)
+        self.assertFalse(Loan.objects.exists())
+
+    def test_borrow_unavailable_copy(self):
+        Copy.objects.filter(pk=self.copy.pk).update(status='damaged')
+
+        with self.assertRaises(CopyNotAvailableError):
+            borrow_copy(self.copy.id, self.user.id, self.due)
+        self.assertFalse(Loan.objects.exists())
+
+    def test_borrow_missing_user_rolls_back_status(self):
+        with self.assertRaises(LoanServiceError):
+            borrow_copy(self.copy.id, 999999, self.due)
+
+        self.copy.refresh_from_db()
+        self.assertEqual(self.copy.status, 'available')
+        self.assertIsNone(self.copy.checkout_date)
+        self.assertFalse(Loan.objects.exists())
+
+    def test_borrow_with_active_loan_rolls_back_status(self):
+        # copy says "available" but an active loan already exists
+        Loan.objects.create(copy=self.copy, user=self.other_user, due_back=self.due)
+
+        with self.assertRaisesMessage(AlreadyLoanedError, f"loaned to user {self.other_user.id}"):
+            borrow_copy(self.copy.id, self.user.id, self.due)
+
+        self.copy.refresh_from_db()
+        self.assertEqual(self.copy.status, 'available')
+        self.assertEqual(Loan.objects.count(), 1)
+
+    def test_borrow_other_integrity_error_is_not_reported_as_loaned(self):
+        # no active loan exists, so the error can't be the one-active-loan constraint
+        with mock.patch.object(Loan.objects, 'create', side_effect=IntegrityError('other')):
+            with self.assertRaisesMessage(IntegrityError, 'other'):
+                borrow_copy(self.copy.id, self.user.id, self.due)
+
+        self.copy.refresh_from_db()
+        self.assertEqual(self.copy.status, 'available')
+
+    # ---------- return_copy ----------
+
+    def test_return_resets_copy(self):
+        borrow_copy(self.copy.id, self.user.id, self.due)
+        self.copy.refresh_from_db()
+        before = self.copy.updated_at
+
+        loan = return_copy(self.copy.id, self.user.id)
+
+        self.assertIsNotNone(loan.returned_at)
+        loan.refresh_from_db()
+        self.assertIsNotNone(loan.returned_at)
+
+        self.copy.refresh_from_db()
+        self.assertEqual(self.copy.status, 'available')
+        self.assertIsNone(self.copy.checkout_date)
+        self.assertIsNone(self.copy.due_date)
+        self.assertGreater(self.copy.updated_at, before)
+
+    def test_return_missing_copy(self):
+        with self.assertRaises(CopyNotFoundError):
+            return_copy(999999, self.user.id)
+
+    def test_return_by_wrong_user(self):
+        borrow_copy(self.copy.id, self.user.id, self.due)
+
+        with self.assertRaises(UnauthorizedReturnError):
+            return_copy(self.copy.id, self.other_user.id)
+
+        self.copy.refresh_from_db()
+        self.assertEqual(self.copy.status, 'borrowed')
+
+    def test_double_return(self):
+        borrow_copy(self.copy.id, self.user.id, self.due)
+        return_copy(self.copy.id, self.user.id)
+
+        with self.assertRaises(NoActiveLoanError):
+            return_copy(self.copy.id, self.user.id)
+
+
+# ============================================================
+# LOAN MODEL: is_overdue
+# ============================================================
+
+class LoanIsOverdueTests(LoanTestCase):
+    """is_overdue works on loans fresh from borrow_copy and on reloaded loans."""
+
+    def test_fresh_loan_with_datetime_due(self):
+        # borrow_copy documents due_at as a datetime; it's stored as a date
+        due = timezone.now() + timedelta(days=14)
+        loan = borrow_copy(self.copy.id, self.user.id, due)
+        self.assertEqual(loan.due_back, timezone.localdate(due))
+        self.assertFalse(loan.is_overdue())
+
+    def test_fresh_loan_with_naive_datetime_due(self):
+        loan = borrow_copy(self.copy.id, self.user.id, datetime(2020, 1, 1))
+        self.assertEqual(loan.due_back, date(2020, 1, 1))
+        self.assertTrue(loan.is_overdue())
+
+    def test_fresh_loan_past_due(self):
+        loan = borrow_copy(self.copy.id, self.user.id, timezone.now() - timedelta(days=2))
+        self.assertTrue(loan.is_overdue())
+
+    def test_reloaded_loan(self):
+        loan = borrow_copy(self.copy.id, self.user.id, timezone.now() - timedelta(days=2))
+        loan.refresh_from_db()
+        self.assertTrue(loan.is_overdue())
+
+        Loan.objects.filter(pk=loan.pk).update(due_back=timezone.localdate() + timedelta(days=1))
+        loan.refresh_from_db()
+        self.assertFalse(loan.is_overdue())
+
+    def test_returned_loan_is_never_overdue(self):
+        borrow_copy(self.copy.id, self.user.id, timezone.now() - timedelta(days=2))
+        loan = return_copy(self.copy.id, self.user.id)
+        self.assertFalse(loan.is_overdue())
+
+
+# ============================================================
+# ADMIN: changelist querysets
+# ============================================================
+
+# The manifest storage needs collectstatic; plain storage is enough to render pages
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class AdminChangelistTests(LoanTestCase):
+    """Admin list views render with the optimized querysets."""
+
+    def setUp(self):
+        super().setUp()
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(admin_user)
+
+    def test_loan_status_column_is_sortable(self):
+        # active loan first, so the default "-borrowed_at" ordering lists it last
+        active = borrow_copy(self.copy.id, self.user.id, self.due)
+        other_copy = Copy.objects.create(book=self.book, barcode='BC-002')
+        borrow_copy(other_copy.id, self.user.id, self.due)
+        returned = return_copy(other_copy.id, self.user.id)
+
+        # column 6 of list_display is loan_status
+        response = self.client.get('/admin/catalog/loan/?o=6')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['cl'].result_list), [active, returned])
+
+        response = self.client.get('/admin/catalog/loan/?o=-6')
+        self.assertEqual(list(response.context['cl'].result_list), [returned, active])
+        self.assertContains(response, 'Active')
+        self.assertContains(response, 'Returned')
+
+    def test_book_changelist_defers_large_columns(self):
+        Book.objects.filter(pk=self.book.pk).update(
+            description='A dystopian novel', metadata={'pages': 328}
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/admin/catalog/book/')
+        self.assertEqual(response.status_code, 200)
+        book_selects = [q['sql'] for q in queries if q['sql'].startswith('SELECT "catalog_book"."id"')]
+        self.assertTrue(book_selects)
+        for sql in book_selects:
+            self.assertNotIn('"catalog_book"."description"', sql)
+            self.assertNotIn('"catalog_book"."metadata"', sql)
+
+    def test_book_change_form_loads_large_columns(self):
+        Book.objects.filter(pk=self.book.pk).update(
+            description='A dystopian novel', metadata={'pages': 328}
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/admin/catalog/book/{self.book.pk}/change/')
+        self.assertContains(response, 'A dystopian novel')
+        self.assertContains(response, 'pages')
+        # the form's single book query carries both columns (no lazy reloads)
+        book_selects = [q['sql'] for q in queries if q['sql'].startswith('SELECT "catalog_book"."id"')]
+        self.assertEqual(len(book_selects), 1)
+        self.assertIn('"catalog_book"."description"', book_selects[0])
+        self.assertIn('"catalog_book"."metadata"', book_selects[0])